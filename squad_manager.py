@@ -5,30 +5,149 @@ Module that implements squad selection algorithm.
 """
 
 
-import sys, argparse
-from io import TextIOWrapper
-import json
+import sys, os, gzip, time, argparse
+from typing import Optional, Tuple
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
 from requests.models import Response
+from urllib3.util.retry import Retry
 import pandas as pd
 import pyomo.environ as pyo
-import highspy
+from pyomo.contrib.appsi.solvers import Highs
+from pyomo.core.expr.numeric_expr import LinearExpression
 
 
 # API base URL
 API_URL = r"https://gaming.uefa.com/en/uclfantasy"
 
+# player fields used from the players feed
+PLAYER_FIELDS = (
+    "id",
+    "pDName",
+    "cCode",
+    "skill",
+    "value",
+    "isActive",
+    "trained",
+    "totPts",
+    "avgPlayerPts",
+    "lastGdPoints",
+)
+
+# matchdays in stages
+MATCHDAYS_IN_STAGES = {
+    "Group stage": [i + 1 for i in range(0, 6)],
+    "Round of 16": [7, 8],
+    "Quarter-finals": [9, 10],
+    "Semi-finals": [11, 12],
+    "Final": [13],
+}
+
+# stage of each matchday
+STAGE_BY_MATCHDAY = {
+    matchday: stage
+    for stage, matchdays in MATCHDAYS_IN_STAGES.items()
+    for matchday in matchdays
+}
+
+# players feed cache directory and max age in seconds
+CACHE_DIR = ".cache"
+CACHE_MAX_AGE = 3600
+
+# required number of players by skills in a squad
+REQD_PLAYERS_BY_SKILLS = {1: 2, 2: 5, 3: 5, 4: 3}
+
+# limit on max number of players per club by stages in a squad
+LIM_PLAYERS_PER_CLUB = {
+    "Group stage": 3,
+    "Round of 16": 4,
+    "Quarter-finals": 5,
+    "Semi-finals": 6,
+    "Final": 8,
+}
+
+# free transfers before matchdays
+LIM_FREE_TRANSFERS = {
+    1: 15,
+    2: 2,
+    3: 2,
+    4: 2,
+    5: 2,
+    6: 2,
+    7: 15,
+    8: 3,
+    9: 5,
+    10: 3,
+    11: 5,
+    12: 3,
+    13: 5,
+}
+
+# budget for matchdays
+BUDGET = {matchday: 100 if matchday <= 6 else 105 for matchday in range(1, 14)}
+
+# login payload, parsed once on first use
+LOGIN_PAYLOAD = None
+
+# longest Retry-After wait in seconds honoured between retries
+RETRY_AFTER_MAX = 3
+
+
+# class to retry requests with a bounded Retry-After wait
+class CappedRetry(Retry):
+    """Retry policy that honours Retry-After up to RETRY_AFTER_MAX seconds"""
+
+    def get_retry_after(self, response) -> Optional[float]:
+        retry_after = super().get_retry_after(response)
+        if retry_after is None:
+            return None
+        return min(retry_after, RETRY_AFTER_MAX)
+
+
+# function to create a session
+def create_session() -> requests.Session:
+    """Create a session that keeps connections to the API alive and retries
+    rate-limited and transient server errors"""
+
+    sn = requests.session()
+    sn.headers.update(
+        {
+            "Host": "gaming.uefa.com",
+            "Referer": "https://gaming.uefa.com/en/uclfantasy/services/index.html",
+            "accept": "application/json",
+        }
+    )
+    retries = CappedRetry(
+        total=3,
+        backoff_factor=0.3,
+        status_forcelist=(429, 500, 502, 503, 504),
+        raise_on_status=False,
+    )
+    sn.mount(
+        "https://",
+        HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=retries),
+    )
+    return sn
+
+
+# function to get the login payload
+def get_login_payload() -> dict:
+    """Get the login payload, reading it from file on first use"""
+
+    global LOGIN_PAYLOAD
+    if LOGIN_PAYLOAD is None:
+        with open("login_payload.json", "rb") as f_login_payload:
+            LOGIN_PAYLOAD = orjson.loads(f_login_payload.read())
+    return LOGIN_PAYLOAD
+
 
 # function to log into a session
-def session_login(sn, payload_file: TextIOWrapper) -> Response:
+def session_login(sn, payload: dict) -> Response:
     """POST request to login into a session"""
 
     url = r"/services/api/Session/login"
-    req = sn.post(
-        API_URL + url,
-        headers={"accept": "application/json", "Content-Type": "application/json"},
-        data=json.dumps(json.load(payload_file)),
-    )
+    req = sn.post(API_URL + url, json=payload)
     print(f"Sent POST request to login: {req.url}")
     return req
 
@@ -38,13 +157,7 @@ def session_logout(sn) -> Response:
     """POST request to logout of the session"""
 
     url = r"/services/api/Session/logout"
-    req = sn.post(
-        API_URL + url,
-        headers={
-            "Host": "gaming.uefa.com",
-            "Referer": "https://gaming.uefa.com/en/uclfantasy/services/index.html",
-        },
-    )
+    req = sn.post(API_URL + url)
     print(f"Sent POST request to logout: {req.url}")
     return req
 
@@ -57,49 +170,121 @@ def get_players_info(sn, gameday_id: int) -> Response:
     req = sn.get(
         API_URL + url,
         params={"gamedayId": gameday_id, "language": "en"},
-        headers={
-            "Host": "gaming.uefa.com",
-            "Referer": "https://gaming.uefa.com/en/uclfantasy/services/index.html",
-        },
     )
     print(f"Sent GET request for players data: {req.url}")
     return req
 
 
+# function to read the cached players data/information
+def read_players_cache(gameday_id: int) -> Optional[bytes]:
+    """Read the cached players feed for a matchday if it is fresh"""
+
+    cache_path = os.path.join(CACHE_DIR, f"players_md{gameday_id}.json.gz")
+    if (
+        not os.path.exists(cache_path)
+        or time.time() - os.path.getmtime(cache_path) > CACHE_MAX_AGE
+    ):
+        return None
+
+    # treat an unreadable or truncated cache file as a miss
+    try:
+        with gzip.open(cache_path, "rb") as f_cache:
+            return f_cache.read()
+    except (OSError, EOFError):
+        return None
+
+
+# function to write the players data/information to the cache
+def write_players_cache(gameday_id: int, content: bytes) -> None:
+    """Write the players feed for a matchday to the cache"""
+
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    cache_path = os.path.join(CACHE_DIR, f"players_md{gameday_id}.json.gz")
+    # write to a temporary file first so readers never see a partial file
+    with gzip.open(cache_path + ".tmp", "wb") as f_cache:
+        f_cache.write(content)
+    os.replace(cache_path + ".tmp", cache_path)
+
+
+# function to read the cached team
+def read_team_cache(guid: str, matchday_id: int) -> Tuple[Optional[str], dict]:
+    """Read the cached team and its ETag for a matchday"""
+
+    cache_path = os.path.join(CACHE_DIR, f"team_{guid}_md{matchday_id}.json")
+    if not os.path.exists(cache_path):
+        return None, {}
+
+    # treat an unreadable or malformed cache file as a miss
+    try:
+        with open(cache_path, "rb") as f_cache:
+            cached = orjson.loads(f_cache.read())
+        return cached["etag"], cached["team"]
+    except (OSError, orjson.JSONDecodeError, KeyError):
+        return None, {}
+
+
+# function to write the team to the cache
+def write_team_cache(guid: str, matchday_id: int, etag: str, team: dict) -> None:
+    """Write the team and its ETag for a matchday to the cache"""
+
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    cache_path = os.path.join(CACHE_DIR, f"team_{guid}_md{matchday_id}.json")
+    # write to a temporary file first so readers never see a partial file
+    with open(cache_path + ".tmp", "wb") as f_cache:
+        f_cache.write(orjson.dumps({"etag": etag, "team": team}))
+    os.replace(cache_path + ".tmp", cache_path)
+
+
 # get current squad
-def get_current_squad(sn, guid: str, matchdayId: int):
+def get_current_squad(sn, guid: str, matchdayId: int, use_cache: bool = True):
     """Get current squad"""
 
     # return if guid is empty
     if guid == "":
         return {}
 
+    # cached team, revalidated with its ETag
+    etag, cached_team = read_team_cache(guid, matchdayId) if use_cache else (None, {})
+
     # try getting current squad
     url = f"/services/api/Gameplay/user/{guid}/team"
     try:
         req = sn.get(
             API_URL + url,
             params={"matchdayId": matchdayId},
-            headers={
-                "Host": "gaming.uefa.com",
-                "Referer": "https://gaming.uefa.com/en/uclfantasy/services/index.html",
-            },
+            headers={"If-None-Match": etag} if etag else None,
         )
         print(f"Sent GET request to get current team: {req.url}")
 
         # process response
+        if req.status_code == 304:
+            print("Team unchanged, using cached team details!")
+            return cached_team
+
         if req.status_code == 200:
             print("Retrieved team details!")
-            return req.json()["data"]["value"]
+            team = orjson.loads(req.content)["data"]["value"]
+            if use_cache and "ETag" in req.headers:
+                write_team_cache(guid, matchdayId, req.headers["ETag"], team)
+            return team
 
         print("Error retrieving team!")
         return {}
 
-    except requests.exceptions:
+    except (requests.RequestException, orjson.JSONDecodeError):
         print("Some error occurred!")
         return {}
 
 
+# function to build a flat linear expression
+def linear_sum(coefs: list, variables: list, constant: float = 0) -> LinearExpression:
+    """Flat linear expression of coefficients times variables plus a constant"""
+
+    return LinearExpression(
+        constant=constant, linear_coefs=coefs, linear_vars=variables
+    )
+
+
 # define basic sets of constraints
 def define_basic_constraints(
     model,
@@ -114,9 +299,10 @@ def define_basic_constraints(
 
     # required number of players by skills
     def rule_ReqdPlayersBySkills(m, skill):
+        players = model.sPlayersWithSkills[skill]
         return (
-            sum(m.ySelectPlayer[p] for p in model.sPlayersWithSkills[skill])
-            == m.pReqdPlayersBySkills[skill]
+            linear_sum([1] * len(players), [m.ySelectPlayer[p] for p in players])
+            == REQD_PLAYERS_BY_SKILLS[skill]
         )
 
     model.cReqdPlayersBySkills = pyo.Constraint(
@@ -125,22 +311,27 @@ def define_basic_constraints(
 
     # player limit per club
     def rule_LimPlayersPerClub(m, club):
+        players = model.sPlayersInClubs[club]
         return (
-            sum(m.ySelectPlayer[p] for p in model.sPlayersInClubs[club])
-            <= m.pLimPlayersPerClub[stage]
+            linear_sum([1] * len(players), [m.ySelectPlayer[p] for p in players])
+            <= LIM_PLAYERS_PER_CLUB[stage]
         )
 
     model.cLimitPlayersPerClub = pyo.Constraint(
         model.sClubs, rule=rule_LimPlayersPerClub
     )
 
+    # value of the selected squad
+    def squad_value(m):
+        return linear_sum(
+            [m.pPlayerValues[p] for p in model.sPlayers],
+            [m.ySelectPlayer[p] for p in model.sPlayers],
+        )
+
     if current_squad == {}:
         # cannot exceed budget
         def rule_Budget(m):
-            return (
-                sum(m.pPlayerValues[p] * m.ySelectPlayer[p] for p in model.sPlayers)
-                <= m.pBudget[matchday]
-            )
+            return squad_value(m) <= BUDGET[matchday]
 
         if not use_wildcard:
             model.cBudget = pyo.Constraint(rule=rule_Budget)
@@ -149,10 +340,9 @@ def define_basic_constraints(
         # balance should be non-negative
         def rule_Balance(m):
             return (
-                sum(m.pPlayerValues[p] for p in model.sCurrentPlayers)
-                - sum(m.pPlayerValues[p] * m.ySelectPlayer[p] for p in model.sPlayers)
+                squad_value(m)
+                <= sum(m.pPlayerValues[p] for p in model.sCurrentPlayers)
                 + current_squad["teamBalance"]
-                >= 0
             )
 
         if not use_wildcard:
@@ -160,9 +350,14 @@ def define_basic_constraints(
 
     # transfer limit
     def rule_LimFreeTransfers(m):
+        players = model.sCurrentPlayers
         return (
-            sum(1 - m.ySelectPlayer[p] for p in model.sCurrentPlayers)
-            <= m.pLimFreeTransfers[matchday] + add_transfers
+            linear_sum(
+                [-1] * len(players),
+                [m.ySelectPlayer[p] for p in players],
+                constant=len(players),
+            )
+            <= LIM_FREE_TRANSFERS[matchday] + add_transfers
         )
 
     if not use_limitless:
@@ -177,6 +372,8 @@ def select_matchday_squad(
     add_transfers: int = 0,
     use_wildcard: bool = False,
     use_limitless: bool = False,
+    mip_gap: float = 0.005,
+    time_limit: float = 5,
 ) -> list:
     """MIP to select the best squad for a given matchday"""
 
@@ -188,195 +385,80 @@ def select_matchday_squad(
         initialize=list(df_player_info["id"]), ordered=False, doc="Set of players"
     )
 
-    # subset of active players
-    model.sActivePlayers = pyo.Set(
-        initialize=list(df_player_info[df_player_info["isActive"] == 1]["id"]),
-        doc="Set of active players",
-    )
-    model.sInactivePlayers = model.sPlayers - model.sActivePlayers
-
-    # subset of players unavailable for selection
-    model.sAvailablePlayers = pyo.Set(
-        initialize=list(
-            df_player_info[
-                df_player_info["trained"].str.match("In contention to start next game")
-            ]["id"]
-        ),
-        doc="Set of players available for selection",
-    )
-    model.sUnavailablePlayers = model.sPlayers - model.sAvailablePlayers
+    # inactive players
+    inactive_players = df_player_info.loc[
+        df_player_info["isActive"] != 1, "id"
+    ].tolist()
 
     # current players in the squad
-    def sCurrentPlayers_init(m):
-        for player in current_squad["playerid"]:
-            yield str(player["id"])
-
     model.sCurrentPlayers = pyo.Set(
-        initialize=sCurrentPlayers_init, doc="Set of players currently in the squad"
+        initialize=[str(player["id"]) for player in current_squad["playerid"]],
+        doc="Set of players currently in the squad",
     )
 
     # set of player skills
-    model.sSkills = pyo.Set(initialize=[1, 2, 3, 4], doc="Set of player skills")
+    model.sSkills = pyo.Set(
+        initialize=list(REQD_PLAYERS_BY_SKILLS), doc="Set of player skills"
+    )
 
     # set of players by skills
-    def sPlayersWithSkills_init(m, skill):
-        for player in list(df_player_info[df_player_info["skill"] == skill]["id"]):
-            yield player
-
+    players_with_skills = df_player_info.groupby("skill")["id"].apply(list).to_dict()
     model.sPlayersWithSkills = pyo.Set(
         model.sSkills,
-        initialize=sPlayersWithSkills_init,
+        initialize=players_with_skills,
         doc="Set of players with a given skill",
     )
 
+    # players grouped by club
+    players_in_clubs = df_player_info.groupby("cCode")["id"].apply(list).to_dict()
+
     # set of clubs
-    model.sClubs = pyo.Set(
-        initialize=list(df_player_info["cCode"].unique()), doc="Set of clubs"
-    )
+    model.sClubs = pyo.Set(initialize=list(players_in_clubs), doc="Set of clubs")
 
     # set of players in clubs
-    def sPlayersInClubs_init(m, club):
-        for player in list(df_player_info[df_player_info["cCode"] == club]["id"]):
-            yield player
-
     model.sPlayersInClubs = pyo.Set(
         model.sClubs,
-        initialize=sPlayersInClubs_init,
+        initialize=players_in_clubs,
         doc="Set of players in a given club",
     )
 
-    # set of matchdays
-    num_matchdays = 13
-    model.sMatchdays = pyo.Set(
-        initialize=[i + 1 for i in range(0, num_matchdays)], doc="Set of matchdays"
-    )
-
-    # set of stages
-    model.sStages = pyo.Set(
-        initialize=[
-            "Group stage",
-            "Round of 16",
-            "Quarter-finals",
-            "Semi-finals",
-            "Final",
-        ],
-        doc="Set of stages",
-    )
-
-    # set of matchdays in stages
-    matchdays_in_stages = {
-        "Group stage": [i + 1 for i in range(0, 6)],
-        "Round of 16": [7, 8],
-        "Quarter-finals": [9, 10],
-        "Semi-finals": [11, 12],
-        "Final": [13],
-    }
-
-    def sMatchdaysInStages_init(m, stage):
-        for matchday in matchdays_in_stages[stage]:
-            yield matchday
-
-    model.sMatchdaysInStages = pyo.Set(
-        model.sStages,
-        initialize=sMatchdaysInStages_init,
-        doc="Set of matchdays in a given stage",
-    )
-
-    # param: required number of players by skills in a squad
-    model.pReqdPlayersBySkills = pyo.Param(
-        model.sSkills,
-        initialize={1: 2, 2: 5, 3: 5, 4: 3},
-        doc="Required number of players by skills",
-    )
-
-    # param: limit players per club by stages in a squad
-    model.pLimPlayersPerClub = pyo.Param(
-        model.sStages,
-        initialize={
-            "Group stage": 3,
-            "Round of 16": 4,
-            "Quarter-finals": 5,
-            "Semi-finals": 6,
-            "Final": 8,
-        },
-        doc="Limit on max number of players per club by stages",
-    )
-
-    # param: free transfer limit for matchdays
-    model.pLimFreeTransfers = pyo.Param(
-        model.sMatchdays,
-        initialize={
-            1: 15,
-            2: 2,
-            3: 2,
-            4: 2,
-            5: 2,
-            6: 2,
-            7: 15,
-            8: 3,
-            9: 5,
-            10: 3,
-            11: 5,
-            12: 3,
-            13: 5,
-        },
-        doc="Free transfers before matchdays",
-    )
-
-    # param: budget
-    def pBudget_init(m, matchday):
-        if matchday > 6:
-            return 105
-        return 100
-
-    model.pBudget = pyo.Param(
-        model.sMatchdays, initialize=pBudget_init, doc="Budget for the matchday"
-    )
+    # player data keyed by player id
+    df_players_by_id = df_player_info.set_index("id")
 
     # param: player value
-    def pPlayerValues_init(m, player):
-        return df_player_info[df_player_info["id"] == player]["value"].iloc[0]
-
     model.pPlayerValues = pyo.Param(
-        model.sPlayers, initialize=pPlayerValues_init, doc="Player values"
+        model.sPlayers,
+        initialize=df_players_by_id["value"].to_dict(),
+        doc="Player values",
     )
 
     # param: player total points
-    def pPlayerTotPoints_init(m, player):
-        return df_player_info[df_player_info["id"] == player]["totPts"].iloc[0]
-
     model.pPlayerTotPoints = pyo.Param(
-        model.sPlayers, initialize=pPlayerTotPoints_init, doc="Player total points"
-    )
-
-    # param: player average points
-    def pPlayerAvgPoints_init(m, player):
-        return df_player_info[df_player_info["id"] == player]["avgPlayerPts"].iloc[0]
-
-    model.pPlayerAvgPoints = pyo.Param(
-        model.sPlayers, initialize=pPlayerAvgPoints_init, doc="Player average points"
+        model.sPlayers,
+        initialize=df_players_by_id["totPts"].to_dict(),
+        doc="Player total points",
     )
 
-    # param: player last game day points
-    def pPlayerLastGdPoints_init(m, player):
-        return df_player_info[df_player_info["id"] == player]["lastGdPoints"].iloc[0]
-
-    model.pPlayerLastGdPoints = pyo.Param(
+    # param: player form, weighted average points and last game day points
+    form_weight = 0.3
+    model.pPlayerFormPoints = pyo.Param(
         model.sPlayers,
-        initialize=pPlayerLastGdPoints_init,
-        doc="Player last game day points",
+        initialize=(
+            (1 - form_weight) * df_players_by_id["avgPlayerPts"]
+            + form_weight * df_players_by_id["lastGdPoints"]
+        ).to_dict(),
+        doc="Player form weighted average points",
     )
 
     # var: binary indicating if a player is selected for matchday squad
     model.ySelectPlayer = pyo.Var(model.sPlayers, domain=pyo.Binary)
 
-    # utils
-    def find_key(d, v):
-        for k, vs in d.items():
-            if v in vs:
-                return k
+    # warm start from the current squad
+    for p in model.sPlayers:
+        model.ySelectPlayer[p].value = 1 if p in model.sCurrentPlayers else 0
 
-    stage = find_key(matchdays_in_stages, matchday)
+    # stage of the matchday
+    stage = STAGE_BY_MATCHDAY[matchday]
 
     # define basic sets of constraints
     define_basic_constraints(
@@ -390,61 +472,60 @@ def select_matchday_squad(
     )
 
     # constraint: exclude inactive players
-    for p in model.sInactivePlayers:
+    for p in inactive_players:
         model.ySelectPlayer[p].fix(0)
 
     # constraint: exclude players not available for selection
     # BUG: Why is 'trained' field '' between matchdays?
-    # for p in model.sUnavailablePlayers:
+    # unavailable_players = df_player_info.loc[
+    #     df_player_info["trained"] != "In contention to start next game", "id"
+    # ].tolist()
+    # for p in unavailable_players:
     #    model.ySelectPlayer[p].fix(0)
 
-    # define objectives
+    # define objective, fusing per player in a single pass:
     ## 1. squad value
-    def objMaxSquadValue(m):
-        return sum(m.pPlayerValues[p] * m.ySelectPlayer[p] for p in model.sPlayers)
-
-    ## 2. total points
-    def objMaxTotalPoints(m):
-        return sum(m.pPlayerTotPoints[p] * m.ySelectPlayer[p] for p in model.sPlayers)
-
+    ## 2. total points (except on the first matchday)
     ## 3. weighted average points and last matchday points (form)
-    form_weight = 0.3
-
-    def objMaxAvgPointsFormWeighted(m):
-        return sum(
-            (
-                (1 - form_weight) * m.pPlayerAvgPoints[p]
-                + form_weight * m.pPlayerLastGdPoints[p]
-            )
-            * m.ySelectPlayer[p]
-            for p in model.sPlayers
-        )
-
-    ## 4. overall objective
     def objOverall(m):
         if matchday == 1:
-            return objMaxAvgPointsFormWeighted(m) + objMaxSquadValue(m)
-        return (
-            objMaxTotalPoints(m) * 0.33
-            + objMaxAvgPointsFormWeighted(m) * 0.33
-            + objMaxSquadValue(m) * 0.33
-            - 4 * add_transfers
+            return linear_sum(
+                [m.pPlayerFormPoints[p] + m.pPlayerValues[p] for p in model.sPlayers],
+                [m.ySelectPlayer[p] for p in model.sPlayers],
+            )
+        return linear_sum(
+            [
+                0.33
+                * (m.pPlayerTotPoints[p] + m.pPlayerFormPoints[p] + m.pPlayerValues[p])
+                for p in model.sPlayers
+            ],
+            [m.ySelectPlayer[p] for p in model.sPlayers],
+            constant=-4 * add_transfers,
         )
 
     # set objective
     model.obj = pyo.Objective(rule=objOverall, sense=pyo.maximize)
 
     # solve MIP to get best squad
-    opt = pyo.SolverFactory("appsi_highs")
-    opt.solve(model, tee=True)
+    opt = Highs()
+    opt.config.stream_solver = True
+    opt.config.warmstart = True
+    opt.config.load_solution = False
+    opt.config.mip_gap = mip_gap
+    opt.config.time_limit = time_limit
+    results = opt.solve(model)
+    if results.best_feasible_objective is None:
+        print(f"No feasible squad found: {results.termination_condition.name}")
+        return []
+    results.solution_loader.load_vars()
 
     # return best squad
-    opt_squad = []
-    for p in model.sPlayers:
-        if pyo.value(model.ySelectPlayer[p]) >= 0.9999:
-            opt_squad.append(
-                df_player_info[df_player_info["id"] == p]["pDName"].iloc[0]
-            )
+    player_names = df_players_by_id["pDName"].to_dict()
+    opt_squad = [
+        player_names[p]
+        for p in model.sPlayers
+        if pyo.value(model.ySelectPlayer[p]) >= 0.9999
+    ]
 
     return opt_squad
 
@@ -485,6 +566,26 @@ def main():
         default=False,
         help="Whether to use limitless for the matchday",
     )
+    parser.add_argument(
+        "--mip-gap",
+        type=float,
+        default=0.005,
+        dest="mip_gap",
+        help="Relative MIP gap at which the solver stops",
+    )
+    parser.add_argument(
+        "--time-limit",
+        type=float,
+        default=5,
+        dest="time_limit",
+        help="Time limit in seconds for the solver",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        dest="no_cache",
+        help="Whether to skip the cached players and team data",
+    )
     args = parser.parse_args()
 
     # match day
@@ -492,84 +593,108 @@ def main():
     add_transfers = args.add_transfers
     use_wildcard = args.wildcard
     use_limitless = args.limitless
+    mip_gap = args.mip_gap
+    time_limit = args.time_limit
+    use_cache = not args.no_cache
     if use_limitless:
         use_wildcard = True
 
     # session
-    sn = requests.session()
+    sn = create_session()
 
     # user GUID
     guid = ""
 
-    with open("login_payload.json", encoding="UTF8") as f_login_payload:
-        # login to a session
-        res = session_login(sn, f_login_payload)
-        if res.status_code == 200:
-            print("Logged in!")
-            guid = res.json()["data"]["value"]["UCL_CLASSIC_RAW"]["guid"]
-        else:
-            print("Error logging in!")
-            sys.exit()
+    # login to a session
+    res = session_login(sn, get_login_payload())
+    if res.status_code == 200:
+        print("Logged in!")
+        guid = orjson.loads(res.content)["data"]["value"]["UCL_CLASSIC_RAW"]["guid"]
+    else:
+        print("Error logging in!")
+        sys.exit()
 
-        # query players data
-        print("Querying player info...")
+    # query players data, from the cache if fresh
+    print("Querying player info...")
+    players_content = read_players_cache(matchday) if use_cache else None
+    if players_content is None:
         res = get_players_info(sn, matchday)
         if res.status_code == 200:
-            print(
-                f"Number of players: {len(res.json()['data']['value']['playerList'])}"
-            )
+            if use_cache:
+                write_players_cache(matchday, res.content)
         else:
             print(f"Status code: {res.status_code}")
+        players_content = res.content
+    else:
+        print("Loaded player info from cache!")
+    player_list = orjson.loads(players_content)["data"]["value"]["playerList"]
+    print(f"Number of players: {len(player_list)}")
+
+    # create a data frame of the player fields used by the bot
+    df_player_info = pd.DataFrame(
+        {
+            field: [player.get(field) for player in player_list]
+            for field in PLAYER_FIELDS
+        }
+    )
+    df_player_info["id"] = df_player_info["id"].astype(str)
+    print(df_player_info.head(10))
+
+    # get current squad
+    # TODO: What if a team is not created yet?
+    current_squad = get_current_squad(sn, guid, matchday, use_cache)
+    filter_list = [str(player["id"]) for player in current_squad["playerid"]]
+    curr_squad_players = df_player_info.loc[
+        df_player_info["id"].isin(filter_list), "pDName"
+    ].tolist()
+
+    # select best squad
+    next_squad_players = select_matchday_squad(
+        df_player_info,
+        matchday,
+        current_squad,
+        add_transfers,
+        use_wildcard,
+        use_limitless,
+        mip_gap,
+        time_limit,
+    )
 
-        # create a data frame
-        df_player_info = pd.json_normalize(res.json()["data"]["value"]["playerList"])
-        print(df_player_info.head(10))
-
-        # get current squad
-        # TODO: What if a team is not created yet?
-        current_squad = get_current_squad(sn, guid, matchday)
-        filter_list = [str(player["id"]) for player in current_squad["playerid"]]
-        curr_squad_players = list(df_player_info.query("id == @filter_list")["pDName"])
-
-        # select best squad
-        next_squad_players = select_matchday_squad(
-            df_player_info,
-            matchday,
-            current_squad,
-            add_transfers,
-            use_wildcard,
-            use_limitless,
-        )
-
-        # compare squads
-        print("\n\n")
-        print(f"Current squad: {curr_squad_players}")
-        print(
-            f"Current Squad value: \
-            {df_player_info.query('pDName == @curr_squad_players')['value'].sum()}"
-        )
-        print("\n")
-        print(
-            f"Transfer out: {set(curr_squad_players).difference(set(next_squad_players))}"
-        )
-        print(
-            f"Transfer in : {set(next_squad_players).difference(set(curr_squad_players))}"
-        )
-        print("\n")
-        print(f"Next Squad: {next_squad_players}")
-        print(
-            f"Next squad value: \
-            {df_player_info.query('pDName == @next_squad_players')['value'].sum()}"
-        )
-        print("\n\n")
-
-        # logout of the session
-        res = session_logout(sn)
-        if res.status_code == 200:
-            print("Logged out!")
-        else:
-            print("Error logging out!")
-            sys.exit()
+    # logout and exit if no squad was found
+    if not next_squad_players:
+        print("No squad to compare, skipping transfers!")
+        session_logout(sn)
+        sys.exit()
+
+    # compare squads
+    print("\n\n")
+    print(f"Current squad: {curr_squad_players}")
+    curr_squad_value = df_player_info.loc[
+        df_player_info["pDName"].isin(curr_squad_players), "value"
+    ].sum()
+    print(f"Current Squad value: {curr_squad_value}")
+    print("\n")
+    print(
+        f"Transfer out: {set(curr_squad_players).difference(set(next_squad_players))}"
+    )
+    print(
+        f"Transfer in : {set(next_squad_players).difference(set(curr_squad_players))}"
+    )
+    print("\n")
+    print(f"Next Squad: {next_squad_players}")
+    next_squad_value = df_player_info.loc[
+        df_player_info["pDName"].isin(next_squad_players), "value"
+    ].sum()
+    print(f"Next squad value: {next_squad_value}")
+    print("\n\n")
+
+    # logout of the session
+    res = session_logout(sn)
+    if res.status_code == 200:
+        print("Logged out!")
+    else:
+        print("Error logging out!")
+        sys.exit()
 
 
 if __name__ == "__main__":